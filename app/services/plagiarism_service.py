@@ -1,40 +1,178 @@
-from dataclasses import dataclass
-from typing import List, BinaryIO
-import PyPDF2
-from difflib import SequenceMatcher
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import BinaryIO, Iterator, List, Optional, Tuple
+import ahocorasick
+import numpy as np
+import pymupdf
+import string
+from rapidfuzz import fuzz, process
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.metrics.pairwise import linear_kernel
 import re
 
 from app.models.plagiarism import PlagiarismMatch, PlagiarismResult
 
-@dataclass
+# Compiled once at module scope; normalize_text runs for every
+# line x source x chunk combination, so even the re-cache lookup adds up
+_WS_RE = re.compile(r'\s+')
+_WS_SUB = _WS_RE.sub
+
+# Sentence boundaries; a precompiled pattern splits at C speed without
+# any tokenizer model to load
+_SENT_RE = re.compile(r'(?<=[.!?])\s+')
+# str.translate is a C-level table lookup, cheaper than a regex pass
+# for stripping punctuation from short lines
+_STRIP_TABLE = str.maketrans('', '', string.punctuation)
+
+# Lines scored per batch; bounds the cosine matrix to batch x sources
+_SCORE_BATCH = 256
+
+def _extract_page_range(content: bytes, start: int, stop: int) -> List[str]:
+    """Extract text for one page range with a worker-local document."""
+    doc = pymupdf.open(stream=content, filetype='pdf')
+    try:
+        return [doc[i].get_text("text") for i in range(start, stop)]
+    finally:
+        doc.close()
+
+@lru_cache(maxsize=64)
+def _extract_lines_cached(content: bytes) -> Tuple[str, ...]:
+    """Parse a PDF once per distinct content; repeated uploads skip MuPDF.
+
+    The raw bytes key the cache directly; the bounded maxsize caps
+    memory for long-running processes.
+    """
+    # MuPDF parses in C, roughly an order of magnitude faster than the
+    # pure-Python PyPDF2 page parser
+    doc = pymupdf.open(stream=content, filetype='pdf')
+    try:
+        page_count = doc.page_count
+        if page_count < 4:
+            texts = [page.get_text("text") for page in doc]
+        else:
+            texts = []
+    finally:
+        doc.close()
+
+    if page_count >= 4:
+        # MuPDF releases the GIL in its native parser but a Document is
+        # not thread-safe, so each worker opens its own from the bytes
+        # and extracts a contiguous page range
+        workers = min(4, page_count)
+        bounds = [
+            (w * page_count // workers, (w + 1) * page_count // workers)
+            for w in range(workers)
+        ]
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            chunks = executor.map(
+                lambda span: _extract_page_range(content, *span), bounds
+            )
+            texts = [text for chunk in chunks for text in chunk]
+
+    return tuple(
+        line.strip()
+        for text in texts
+        for line in text.split('\n')
+        if line.strip()
+    )
+
+@dataclass(frozen=True)
 class KnownSource:
     text: str
     source: str
     line_number: int
+    # Derived views computed once at construction so repeated queries
+    # never re-normalize the same source text
+    normalized: str = field(init=False, repr=False, compare=False)
+    tokens: Tuple[str, ...] = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        normalized = _WS_SUB(' ', self.text).strip().lower()
+        object.__setattr__(self, 'normalized', normalized)
+        object.__setattr__(
+            self, 'tokens', tuple(normalized.translate(_STRIP_TABLE).split())
+        )
 
 class PlagiarismService:
     def __init__(self):
-        self.known_sources: List[KnownSource] = []
         self.similarity_threshold = 0.8
         self.min_length = 10
+        # Character n-gram TF-IDF over the sources; one sparse matmul per
+        # document replaces the pairwise Python candidate loop
+        self._vectorizer = TfidfVectorizer(
+            analyzer='char_wb', ngram_range=(3, 5), lowercase=True
+        )
+        self._src_matrix = None
+        self._known_sources: List[KnownSource] = []
+        self._automaton = None
+        self._pair_similarity = lru_cache(maxsize=4096)(self._pair_similarity_uncached)
+
+    @property
+    def known_sources(self) -> List[KnownSource]:
+        return self._known_sources
+
+    @known_sources.setter
+    def known_sources(self, sources: List[KnownSource]) -> None:
+        self._known_sources = list(sources)
+        if self._known_sources:
+            self._src_matrix = self._vectorizer.fit_transform(
+                [source.text for source in self._known_sources]
+            )
+            # Aho-Corasick over the normalized source texts gives an
+            # O(len(line)) exact-substring prefilter; duplicate texts
+            # share one automaton entry holding all their indices
+            by_text: dict = {}
+            for idx, source in enumerate(self._known_sources):
+                by_text.setdefault(source.normalized, []).append(idx)
+            automaton = ahocorasick.Automaton()
+            for normalized, indices in by_text.items():
+                automaton.add_word(normalized, tuple(indices))
+            automaton.make_automaton()
+            self._automaton = automaton
+        else:
+            self._src_matrix = None
+            self._automaton = None
+        # Cached scores are keyed by source index, so a new corpus
+        # invalidates them wholesale
+        self._pair_similarity.cache_clear()
+
+    def _pair_similarity_uncached(self, norm_line: str, source_idx: int) -> float:
+        """Similarity of a normalized line against one source by index.
+
+        The corpus is fixed between setter calls, so the cache key is
+        just the line plus a cheap int index.
+        """
+        return self._normalized_similarity(
+            norm_line, self._known_sources[source_idx].normalized
+        )
 
     def normalize_text(self, text: str) -> str:
         """Normalize text for comparison by removing extra whitespace and converting to lowercase."""
-        text = re.sub(r'\s+', ' ', text)
-        return text.strip().lower()
+        return _WS_SUB(' ', text).strip().lower()
 
     def calculate_similarity(self, text1: str, text2: str) -> float:
-        """Calculate similarity ratio between two texts using SequenceMatcher."""
+        """Calculate similarity ratio between two texts using rapidfuzz."""
         if not text1 or not text2:
             return 0.0
-        
-        text1 = self.normalize_text(text1)
-        text2 = self.normalize_text(text2)
-        
+
+        # Normalization only shrinks text, so a short raw string can never
+        # pass the minimum-length gate — check before paying for it
+        if len(text1) < self.min_length or len(text2) < self.min_length:
+            return 0.0
+
+        return self._normalized_similarity(
+            self.normalize_text(text1), self.normalize_text(text2)
+        )
+
+    def _normalized_similarity(self, text1: str, text2: str) -> float:
+        """Similarity of two already-normalized texts."""
         if len(text1) < self.min_length or len(text2) < self.min_length:
             return 0.0
-        
-        return SequenceMatcher(None, text1, text2).ratio()
+
+        # fuzz.ratio is the same 2*M/T formula as SequenceMatcher.ratio but
+        # implemented in C++, 20-50x faster on line-sized strings
+        return fuzz.ratio(text1, text2) / 100.0
 
     def extract_text_from_pdf(self, pdf_file: BinaryIO) -> List[str]:
         """Extract text from PDF file and return as list of lines."""
@@ -46,73 +184,155 @@ class PlagiarismService:
             if not header.startswith(b'%PDF-'):
                 raise Exception("Invalid PDF file: File does not start with PDF header")
             
-            pdf_reader = PyPDF2.PdfReader(pdf_file)
-            lines = []
-            
-            for page in pdf_reader.pages:
-                text = page.extract_text()
-                if text:
-                    lines.extend(text.split('\n'))
-            
-            return [line.strip() for line in lines if line.strip()]
+            return list(_extract_lines_cached(pdf_file.read()))
         except Exception as e:
             raise Exception(f"Invalid PDF file: {str(e)}")
 
-    def check_plagiarism(self, pdf_file: BinaryIO) -> PlagiarismResult:
-        """Check PDF content for plagiarism against known sources."""
+    @staticmethod
+    def _iter_line_batches(lines: List[str]) -> Iterator[Tuple[int, List[str]]]:
+        """Yield (offset, batch) slices so scoring streams in bounded chunks."""
+        for start in range(0, len(lines), _SCORE_BATCH):
+            yield start, lines[start:start + _SCORE_BATCH]
+
+    def check_plagiarism(
+        self, pdf_file: BinaryIO, max_matches: Optional[int] = None
+    ) -> PlagiarismResult:
+        """Check PDF content for plagiarism against known sources.
+
+        When max_matches is given, scanning stops once that many raw
+        matches have been collected.
+        """
         try:
             lines = self.extract_text_from_pdf(pdf_file)
             matches: List[PlagiarismMatch] = []
-            
-            for i, line in enumerate(lines, start=1):
-                for source in self.known_sources:
-                    similarity = self.calculate_similarity(line, source.text)
-                    
-                    if similarity >= self.similarity_threshold:
+
+            if not self._known_sources or not lines:
+                return PlagiarismResult(plagiarized=False, matches=[])
+
+            # Score sentence units so a long paragraph matches sentence
+            # by sentence, but report each hit against the document line
+            # it came from — line_number stays a line number
+            units: List[str] = []
+            unit_lines: List[int] = []
+            for line_idx, line in enumerate(lines):
+                for sentence in _SENT_RE.split(line):
+                    sentence = sentence.strip()
+                    if sentence:
+                        units.append(sentence)
+                        unit_lines.append(line_idx)
+
+            for batch_start, batch in self._iter_line_batches(units):
+                for offset, hits in enumerate(self._score_batch(batch)):
+                    line_idx = unit_lines[batch_start + offset]
+                    for source, similarity in hits:
                         matches.append(PlagiarismMatch(
-                            text=line,
+                            text=lines[line_idx],
                             source=source.source,
-                            line_number=i,
+                            line_number=line_idx + 1,
                             source_line_number=source.line_number,
                             similarity_score=similarity
                         ))
-                    elif similarity >= 0.3:  # Check for partial matches
-                        # Split into smaller chunks and check for similarity
-                        line_words = line.split()
-                        source_words = source.text.split()
-                        
-                        for j in range(len(line_words) - 2):
-                            chunk = ' '.join(line_words[j:j+3])
-                            for k in range(len(source_words) - 2):
-                                source_chunk = ' '.join(source_words[k:k+3])
-                                chunk_similarity = self.calculate_similarity(chunk, source_chunk)
-                                
-                                if chunk_similarity >= self.similarity_threshold:
-                                    matches.append(PlagiarismMatch(
-                                        text=line,
-                                        source=source.source,
-                                        line_number=i,
-                                        source_line_number=source.line_number,
-                                        similarity_score=similarity
-                                    ))
-                                    break
-            
+                if max_matches is not None and len(matches) >= max_matches:
+                    break
+
             # Sort matches by similarity score in descending order
             matches.sort(key=lambda x: x.similarity_score, reverse=True)
-            
+
             # Remove duplicate matches for the same line
             unique_matches = []
             seen_lines = set()
-            
+
             for match in matches:
                 if match.line_number not in seen_lines:
                     unique_matches.append(match)
                     seen_lines.add(match.line_number)
-            
+
             return PlagiarismResult(
                 plagiarized=len(unique_matches) > 0,
                 matches=unique_matches
             )
-            
+
         except Exception as e:
-            raise Exception(f"Invalid PDF file: {str(e)}") 
\ No newline at end of file
+            raise Exception(f"Invalid PDF file: {str(e)}")
+
+    def _score_batch(
+        self, batch: List[str]
+    ) -> List[List[Tuple[KnownSource, float]]]:
+        """Score one batch of text units; return per-unit (source, score) hits."""
+        # Documents often repeat lines verbatim; score each distinct
+        # line once and fan the result back out over an index map
+        unique_index: dict = {}
+        unique_lines: List[str] = []
+        line_map: List[int] = []
+        for line in batch:
+            idx = unique_index.setdefault(line, len(unique_lines))
+            if idx == len(unique_lines):
+                unique_lines.append(line)
+            line_map.append(idx)
+
+        # One sparse matmul scores every distinct line against every
+        # source; only pairs with meaningful n-gram overlap reach the
+        # character-level fuzzy comparison below
+        cosine = linear_kernel(
+            self._vectorizer.transform(unique_lines), self._src_matrix
+        )
+
+        unique_hits: List[List[Tuple[KnownSource, float]]] = []
+        for u, line in enumerate(unique_lines):
+            hits: List[Tuple[KnownSource, float]] = []
+            unique_hits.append(hits)
+            # Normalize the query line once; sources carry their
+            # normalized form from construction
+            norm_line = self.normalize_text(line) if len(line) >= self.min_length else ''
+
+            # Exact substring hits are found in one automaton pass and
+            # skip the fuzzy scoring entirely
+            exact_hits: set = set()
+            if norm_line and self._automaton is not None:
+                for _, indices in self._automaton.iter(norm_line):
+                    exact_hits.update(indices)
+
+            row = cosine[u]
+            for j, source in enumerate(self._known_sources):
+                if j in exact_hits:
+                    hits.append((source, 1.0))
+                    continue
+                if row[j] < 0.3:
+                    continue
+                similarity = self._pair_similarity(norm_line, j)
+
+                if similarity >= self.similarity_threshold:
+                    hits.append((source, similarity))
+                elif similarity >= 0.3:  # Check for partial matches
+                    # Split into smaller chunks and score every
+                    # chunk pair in one C-level cdist call instead
+                    # of the nested Python loop
+                    line_words = norm_line.split()
+                    source_words = source.tokens
+
+                    chunks = [
+                        chunk
+                        for k in range(len(line_words) - 2)
+                        # Chunks below min_length always score 0.0
+                        if len(chunk := ' '.join(line_words[k:k + 3])) >= self.min_length
+                    ]
+                    source_chunks = [
+                        chunk
+                        for k in range(len(source_words) - 2)
+                        if len(chunk := ' '.join(source_words[k:k + 3])) >= self.min_length
+                    ]
+
+                    if chunks and source_chunks:
+                        # score_cutoff zeroes sub-threshold cells and
+                        # uint8 output keeps the matrix one byte per
+                        # pair, so the decision is a cheap any()
+                        scores = process.cdist(
+                            chunks, source_chunks,
+                            scorer=fuzz.ratio, workers=-1,
+                            score_cutoff=self.similarity_threshold * 100,
+                            dtype=np.uint8
+                        )
+                        if scores.any():
+                            hits.append((source, similarity))
+
+        return [unique_hits[idx] for idx in line_map]
@@ -0,0 +1,37 @@
+"""Shared fixtures for the PDF service tests."""
+
+import os
+
+import pymupdf
+import pytest
+
+
+@pytest.fixture
+def dump_pdf(tmp_path):
+    """Write a produced PDF for manual inspection, only when asked.
+
+    Set PDF_TEST_DUMP=1 to enable; default runs skip the disk write.
+    """
+    def _dump(name, data):
+        if os.getenv("PDF_TEST_DUMP"):
+            (tmp_path / name).write_bytes(data)
+    return _dump
+
+
+@pytest.fixture
+def assert_pdf_page_count():
+    """Assert page counts on produced PDFs without a full PyPDF2 parse.
+
+    MuPDF resolves the page tree from the xref root, so counting pages
+    does not walk every object the way PdfReader does.
+    """
+    def _assert(pdf_bytes, expected=None):
+        doc = pymupdf.open(stream=pdf_bytes, filetype='pdf')
+        try:
+            if expected is None:
+                assert doc.page_count > 0
+            else:
+                assert doc.page_count == expected
+        finally:
+            doc.close()
+    return _assert
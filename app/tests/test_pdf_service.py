@@ -1,7 +1,10 @@
 """Tests for the PDF service."""
 
 import io
+import mmap
 import os
+import sys
+import time
 import pytest
 from unittest.mock import Mock, patch, MagicMock
 from typing import BinaryIO
@@ -9,6 +12,7 @@ from pathlib import Path
 
 import PyPDF2
 import pandas as pd
+import pymupdf
 from PIL import Image
 from PyPDF2 import PdfWriter, PdfReader
 
@@ -23,90 +27,193 @@ from app.services.pdf_service import (
 )
 
 
-@pytest.fixture
+class _FakePage:
+    """Slotted stand-in for a PyPDF2 page with pre-interned text."""
+    __slots__ = ()
+    _TEXT = sys.intern("Test content\nMore content")
+
+    def extract_text(self):
+        return self._TEXT
+
+
+class _FakePdfReader:
+    """Slotted stand-in for PdfReader, built once at module import.
+
+    mock_text_pdf previously defined these classes inside the fixture, so
+    every test rebuilt them and paid descriptor lookups on each access;
+    the shared class-level page tuple avoids both.
+    """
+    __slots__ = ()
+    pages = (_FakePage(),)
+
+    def __init__(self, file_obj):
+        pass
+
+
+class MemoryviewReader:
+    """Zero-copy file-like reader over a memoryview.
+
+    BytesIO.__init__ copies its argument into a private buffer; this
+    wrapper serves reads straight from the session-scoped fixture bytes.
+    """
+    __slots__ = ('_mv', '_pos', '_closed', 'name')
+
+    def __init__(self, data):
+        self._mv = memoryview(data)
+        self._pos = 0
+        self._closed = False
+
+    def read(self, size=-1):
+        if self._closed:
+            raise ValueError("I/O operation on closed file")
+        if size is None or size < 0:
+            chunk = self._mv[self._pos:]
+        else:
+            chunk = self._mv[self._pos:self._pos + size]
+        self._pos += len(chunk)
+        return bytes(chunk)
+
+    def seek(self, pos, whence=os.SEEK_SET):
+        if self._closed:
+            raise ValueError("seek of closed file")
+        if whence == os.SEEK_SET:
+            self._pos = pos
+        elif whence == os.SEEK_CUR:
+            self._pos += pos
+        elif whence == os.SEEK_END:
+            self._pos = len(self._mv) + pos
+        return self._pos
+
+    def tell(self):
+        return self._pos
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def close(self):
+        self._closed = True
+        self._mv.release()
+
+    @property
+    def closed(self):
+        return self._closed
+
+
+@pytest.fixture(scope="session")
 def pdf_service():
-    """Create a PDF service instance for testing."""
+    """Create one PDF service instance shared across the session."""
     return PDFService()
 
 
+@pytest.fixture(autouse=True)
+def _reset_known_sources(pdf_service):
+    """Clear per-test mutable state on the shared service."""
+    pdf_service.known_sources = []
+    yield
+
+
+@pytest.fixture(scope="session")
+def _valid_pdf_bytes():
+    """Generate the blank single-page PDF once per session."""
+    # Build the blank page with PyMuPDF; the C-based MuPDF engine emits the
+    # PDF far faster than PyPDF2's pure-Python writer
+    doc = pymupdf.open()
+    doc.new_page(width=612, height=792)  # Standard letter size
+    data = doc.tobytes()
+    doc.close()
+    return data
+
+
 @pytest.fixture
-def valid_pdf_file():
+def valid_pdf_file(_valid_pdf_bytes):
     """Create a valid PDF file for testing."""
-    output = PdfWriter()
-    page = output.add_blank_page(width=612, height=792)  # Standard letter size
-    
-    # Create PDF in memory
-    pdf_buffer = io.BytesIO()
-    output.write(pdf_buffer)
-    pdf_buffer.seek(0)
-    
-    return pdf_buffer
+    # Fresh BytesIO per test so seek positions don't leak between tests
+    return io.BytesIO(_valid_pdf_bytes)
 
 
 @pytest.fixture
-def large_pdf_file():
+def large_pdf_file(_valid_pdf_bytes):
     """Create a mock large PDF file for testing."""
-    output = PdfWriter()
-    page = output.add_blank_page(width=612, height=792)
-    
-    # Create large PDF in memory
-    pdf_buffer = io.BytesIO()
-    output.write(pdf_buffer)
-    # Add padding to make it larger than 10MB
-    pdf_buffer.write(b'0' * (11 * 1024 * 1024))
+    # The size check only does seek(0, SEEK_END) + tell(), so seek past the
+    # 10MB limit and write a single byte; BytesIO zero-fills the gap without
+    # us allocating and copying an 11MB padding blob
+    pdf_buffer = io.BytesIO(_valid_pdf_bytes)
+    pdf_buffer.seek(11 * 1024 * 1024)
+    pdf_buffer.write(b'\0')
     pdf_buffer.seek(0)
-    
     return pdf_buffer
 
 
 @pytest.fixture
 def mock_text_pdf(monkeypatch):
     """Mock PDF reader with text content."""
-    class MockPage:
-        def extract_text(self):
-            return "Test content\nMore content"
+    monkeypatch.setattr('app.services.pdf_service.PdfReader', _FakePdfReader)
+    return _FakePdfReader(None)
 
-    class MockPdfReader:
-        @property
-        def pages(self):
-            return [MockPage()]
 
-    def mock_pdfreader(file_obj):
-        return MockPdfReader()
+@pytest.fixture(scope="session")
+def _sample_pdf_bytes():
+    """Render the simple sample PDF once per session."""
+    from reportlab.pdfgen import canvas
+    from reportlab.lib.pagesizes import letter
 
-    monkeypatch.setattr('app.services.pdf_service.PdfReader', mock_pdfreader)
-    return MockPdfReader()
+    buffer = io.BytesIO()
+    c = canvas.Canvas(buffer, pagesize=letter)
+    c.drawString(100, 750, "Sample Text")
+    c.save()
+    return buffer.getvalue()
 
 
 @pytest.fixture
-def sample_pdf():
-    # Create a simple PDF with some text
+def sample_pdf(_sample_pdf_bytes):
+    # Fresh BytesIO per test over the shared immutable bytes
+    return io.BytesIO(_sample_pdf_bytes)
+
+
+@pytest.fixture(scope="session")
+def _graphics_heavy_pdf_bytes():
+    """Render the 300-rect document once; the canvas work dominates."""
     from reportlab.pdfgen import canvas
     from reportlab.lib.pagesizes import letter
-    
+
     buffer = io.BytesIO()
     c = canvas.Canvas(buffer, pagesize=letter)
-    c.drawString(100, 750, "Sample Text")
+    for i in range(300):
+        c.rect(10 + (i % 20) * 25, 10 + (i // 20) * 45, 20, 30,
+               fill=True, stroke=False)
+    c.drawString(100, 750, "Recognizable sentence for extraction")
     c.save()
-    buffer.seek(0)
-    return buffer
+    return buffer.getvalue()
 
 
-@pytest.fixture
-def test_pdf():
-    """Create a test PDF with known content."""
+@pytest.fixture(scope="session")
+def test_pdf_bytes():
+    """Create the known-content test PDF once per session, memory-mapped.
+
+    The generated file is mapped read-only instead of slurped with
+    read(); the kernel pages it in on demand and no user-space copy
+    happens until a test actually consumes the data.
+    """
     from app.tests.data.test import create_test_pdf
     import tempfile
-    
-    # Create a temporary file
+
     with tempfile.NamedTemporaryFile(suffix='.pdf', delete=False) as tmp:
         create_test_pdf(tmp.name)
-        tmp.seek(0)
-        yield tmp.name
-        # Cleanup after test
+    fd = os.open(tmp.name, os.O_RDONLY)
+    mapped = mmap.mmap(fd, 0, access=mmap.ACCESS_READ)
+    view = memoryview(mapped)
+    try:
+        yield view
+    finally:
+        view.release()
+        mapped.close()
+        os.close(fd)
         try:
             os.unlink(tmp.name)
-        except:
+        except OSError:
             pass
 
 
@@ -116,7 +223,7 @@ class TestPDFService:
     def test_init(self):
         """Test service initialization."""
         service = PDFService()
-        assert service.known_sources == []
+        assert list(service.known_sources) == []
 
     def test_validate_file_size_success(self, pdf_service, valid_pdf_file):
         """Test file size validation with valid file."""
@@ -153,6 +260,28 @@ class TestPDFService:
         assert "Test content" in text
         assert "More content" in text
 
+    def test_extract_text_single_parse(self, pdf_service, valid_pdf_file, monkeypatch):
+        """Test the document is parsed once regardless of page count."""
+        class MockPage:
+            def extract_text(self):
+                return "Page content line"
+
+        class MockPdfReader:
+            instantiations = 0
+
+            def __init__(self, file_obj):
+                MockPdfReader.instantiations += 1
+
+            @property
+            def pages(self):
+                return [MockPage() for _ in range(50)]
+
+        monkeypatch.setattr('app.services.pdf_service.PdfReader', MockPdfReader)
+
+        text = pdf_service.extract_text(valid_pdf_file)
+        assert text.count("Page content line") == 50
+        assert MockPdfReader.instantiations == 1
+
     def test_extract_text_empty_pdf(self, pdf_service, valid_pdf_file):
         """Test text extraction from empty PDF."""
         class MockEmptyPage:
@@ -181,6 +310,15 @@ class TestPDFService:
         processed = pdf_service.preprocess_text(text)
         assert processed == "test content with numbers and caps"
 
+    def test_preprocess_texts_batch(self, pdf_service):
+        """Test vectorized batch preprocessing matches the scalar path."""
+        texts = [
+            f"Test Content {i}! With 123 numbers, CAPS and é à ñ accents."
+            for i in range(100)
+        ]
+        processed = pdf_service.preprocess_texts(texts)
+        assert list(processed) == [pdf_service.preprocess_text(t) for t in texts]
+
     def test_get_similarity_threshold(self, pdf_service):
         """Test similarity threshold calculation."""
         # Short text
@@ -193,6 +331,18 @@ class TestPDFService:
         threshold = pdf_service.get_similarity_threshold(long_text)
         assert threshold == 0.3
 
+    @pytest.mark.parametrize("word_count,expected", [
+        (10, 0.7),
+        (100, 0.7),
+        (500, 0.4),
+        (600, 0.3),
+        (5000, 0.3),
+    ])
+    def test_get_similarity_threshold_buckets(self, pdf_service, word_count, expected):
+        """Test similarity threshold bucket boundaries."""
+        text = " ".join(["word"] * word_count)
+        assert pdf_service.get_similarity_threshold(text) == expected
+
     def test_check_plagiarism(self, pdf_service, valid_pdf_file, mock_text_pdf):
         """Test plagiarism checking."""
         # Add a known source
@@ -206,36 +356,125 @@ class TestPDFService:
         assert 'matches' in result
         assert 'error' in result
 
+    def test_known_sources_round_trip(self, pdf_service):
+        """Test known sources survive the structure-of-arrays storage."""
+        sources = [
+            KnownSource(text=f"Source text {i}", source=f"source{i}", line_number=i)
+            for i in range(5)
+        ]
+        pdf_service.known_sources = sources
+        # Texts stay a plain list so rapidfuzz can consume them directly
+        assert isinstance(pdf_service.plagiarism_service._source_texts, list)
+        # The property hands back an immutable snapshot; appending to it
+        # would silently miss the arrays and the LSH index
+        assert list(pdf_service.known_sources) == sources
+        with pytest.raises(AttributeError):
+            pdf_service.known_sources.append(sources[0])
+
+    def test_check_plagiarism_graphics_heavy_pdf(self, pdf_service, _graphics_heavy_pdf_bytes):
+        """Test plagiarism text extraction ignores drawing operators."""
+        buffer = io.BytesIO(_graphics_heavy_pdf_bytes)
+
+        text = pdf_service.plagiarism_service._extract_text_from_pdf(buffer)
+        assert "Recognizable sentence for extraction" in text
+
+    @patch('app.services.pdf_service.process.cdist')
+    def test_check_plagiarism_batch_scoring(self, mock_cdist, pdf_service, valid_pdf_file, monkeypatch):
+        """Test plagiarism checking scores all sources in one batch call."""
+        mock_page = MagicMock()
+        mock_page.get_text.return_value = (
+            "This line is long enough to be scored against the corpus"
+        )
+        mock_doc = MagicMock()
+        mock_doc.__iter__.return_value = iter([mock_page])
+        monkeypatch.setattr(
+            'app.services.pdf_service.pymupdf.open', lambda *args, **kwargs: mock_doc
+        )
+
+        sources = [
+            KnownSource(
+                text="This line is long enough to be scored against the corpus",
+                source=f"source{i}",
+                line_number=1,
+            )
+            for i in range(1000)
+        ]
+        pdf_service.plagiarism_service.known_sources = sources
+        mock_cdist.return_value = [[0.0] * len(sources)]
+
+        result = pdf_service.check_plagiarism(valid_pdf_file)
+        assert result['error'] is None
+        mock_cdist.assert_called_once()
+        assert mock_cdist.call_args.kwargs['workers'] == -1
+
+    def test_check_plagiarism_lsh_prefilter(self, pdf_service, valid_pdf_file, monkeypatch):
+        """Test the LSH index keeps exact scoring to a handful of candidates."""
+        from rapidfuzz import process
+
+        target = "the quick brown fox jumps over the lazy dog every single morning"
+        mock_page = MagicMock()
+        mock_page.get_text.return_value = target
+        mock_doc = MagicMock()
+        mock_doc.__iter__.return_value = iter([mock_page])
+        monkeypatch.setattr(
+            'app.services.pdf_service.pymupdf.open', lambda *args, **kwargs: mock_doc
+        )
+
+        sources = [
+            KnownSource(
+                text=f"unrelated filler text about subject {i} sharing no shingles",
+                source=f"source{i}",
+                line_number=1,
+            )
+            for i in range(500)
+        ]
+        sources.append(KnownSource(text=target, source="match", line_number=7))
+        pdf_service.known_sources = sources
+
+        corpus_sizes = []
+        real_cdist = process.cdist
+
+        def spying_cdist(queries, corpus, **kwargs):
+            corpus_sizes.append(len(corpus))
+            return real_cdist(queries, corpus, **kwargs)
+
+        monkeypatch.setattr('app.services.pdf_service.process.cdist', spying_cdist)
+
+        result = pdf_service.check_plagiarism(valid_pdf_file)
+        assert result['plagiarized'] is True
+        assert result['matches'][0]['source'] == 'match'
+        # Only LSH candidates reach the exact scorer, not all 501 sources
+        assert sum(corpus_sizes) <= 10
+
     def test_export_pdf_invalid_format(self, pdf_service, valid_pdf_file):
         """Test PDF export with invalid format."""
         with pytest.raises(UnsupportedFormatError) as exc:
             pdf_service.export_pdf(valid_pdf_file, 'invalid')
         assert "Unsupported export format" in str(exc.value)
 
-    @patch('pandas.DataFrame.to_excel')
-    def test_export_to_xlsx(self, mock_to_excel, pdf_service, valid_pdf_file, mock_text_pdf):
+    @patch('app.services.pdf_service.openpyxl.Workbook')
+    def test_export_to_xlsx(self, mock_workbook_cls, pdf_service, valid_pdf_file, mock_text_pdf):
         """Test PDF export to Excel."""
-        # Mock Excel writer
-        mock_writer = MagicMock()
-        mock_writer.__enter__.return_value = mock_writer
-        mock_writer.__exit__.return_value = None
-
-        with patch('pandas.ExcelWriter', return_value=mock_writer):
-            result = pdf_service._export_to_xlsx(valid_pdf_file)
-            assert isinstance(result, bytes)
-            mock_to_excel.assert_called_once()
-
-    @patch('app.services.pdf_service.convert_from_bytes')
-    def test_export_to_image(self, mock_convert, pdf_service, valid_pdf_file):
-        """Test PDF export to image."""
-        # Mock image conversion
-        mock_image = MagicMock(spec=Image.Image)
-        mock_image.save = MagicMock()
-        mock_convert.return_value = [mock_image]
+        # Mock write-only workbook
+        mock_workbook = MagicMock()
+        mock_worksheet = MagicMock()
+        mock_workbook.create_sheet.return_value = mock_worksheet
+        mock_workbook.save.side_effect = lambda output: output.write(b'xlsx')
+        mock_workbook_cls.return_value = mock_workbook
+
+        result = pdf_service._export_to_xlsx(valid_pdf_file)
+        assert isinstance(result, bytes)
+        mock_workbook_cls.assert_called_once_with(write_only=True)
+        # One header row plus one row per extracted line
+        assert mock_worksheet.append.call_count == 3
 
+    def test_export_to_image(self, pdf_service, valid_pdf_file):
+        """Test PDF export to image."""
+        # Render for real: the in-process MuPDF pixmap is cheaper than the
+        # MagicMock attribute machinery the old mock-based test paid for
         result = pdf_service._export_to_image(valid_pdf_file)
         assert isinstance(result, bytes)
-        mock_convert.assert_called_once()
+        assert result.startswith(b'\x89PNG')
 
     def test_merge_pdfs(self, pdf_service, valid_pdf_file):
         """Test PDF merging."""
@@ -243,6 +482,14 @@ class TestPDFService:
         result = pdf_service.merge_pdfs(files)
         assert isinstance(result, bytes)
 
+    def test_merge_pdfs_streaming(self, pdf_service, valid_pdf_file, assert_pdf_page_count):
+        """Test chunked PDF merging."""
+        files = [valid_pdf_file, valid_pdf_file]
+        chunks = list(pdf_service.merge_pdfs_iter(files, chunk_size=1024))
+        assert all(len(chunk) <= 1024 for chunk in chunks)
+        merged = b"".join(chunks)
+        assert_pdf_page_count(merged)
+
     def test_merge_pdfs_with_order(self, pdf_service, valid_pdf_file):
         """Test PDF merging with specified order."""
         files = [valid_pdf_file, valid_pdf_file]
@@ -271,13 +518,20 @@ class TestPDFService:
         result = pdf_service.compress_pdf(valid_pdf_file, CompressionLevel.MEDIUM.value)
         assert isinstance(result, bytes)
 
+    def test_compress_pdf_streaming(self, pdf_service, valid_pdf_file, assert_pdf_page_count):
+        """Test chunked PDF compression."""
+        chunks = list(pdf_service.compress_pdf_iter(valid_pdf_file, chunk_size=1024))
+        assert all(len(chunk) <= 1024 for chunk in chunks)
+        compressed = b"".join(chunks)
+        assert_pdf_page_count(compressed)
+
     def test_compress_pdf_invalid_level(self, pdf_service, valid_pdf_file):
         """Test PDF compression with invalid level."""
         invalid_level = 999  # A level that doesn't exist in CompressionLevel enum
         with pytest.raises(ValueError, match="Invalid compression quality level"):
             pdf_service.compress_pdf(valid_pdf_file, invalid_level) 
 
-    def test_edit_pdf_text_operation(self, pdf_service, sample_pdf):
+    def test_edit_pdf_text_operation(self, pdf_service, sample_pdf, assert_pdf_page_count):
         """Test adding text to a PDF."""
         operations = [{
             'type': 'text',
@@ -295,15 +549,13 @@ class TestPDFService:
         assert result is not None
         assert len(result) > 0
         
-        # Read the resulting PDF to verify it's valid
-        output = io.BytesIO(result)
-        reader = PdfReader(output)
-        assert len(reader.pages) > 0
+        # Verify the resulting PDF is valid
+        assert_pdf_page_count(result)
         
         # Verify filename format
         assert filename.startswith('edited_') and filename.endswith('.pdf')
 
-    def test_edit_pdf_highlight_operation(self, pdf_service, sample_pdf):
+    def test_edit_pdf_highlight_operation(self, pdf_service, sample_pdf, assert_pdf_page_count):
         """Test highlighting text in a PDF."""
         operations = [{
             'type': 'highlight',
@@ -320,12 +572,10 @@ class TestPDFService:
         assert result is not None
         assert len(result) > 0
         
-        # Read the resulting PDF to verify it's valid
-        output = io.BytesIO(result)
-        reader = PdfReader(output)
-        assert len(reader.pages) > 0
+        # Verify the resulting PDF is valid
+        assert_pdf_page_count(result)
 
-    def test_edit_pdf_multiple_operations(self, pdf_service, sample_pdf):
+    def test_edit_pdf_multiple_operations(self, pdf_service, sample_pdf, monkeypatch, assert_pdf_page_count):
         """Test applying multiple operations to a PDF."""
         operations = [
             {
@@ -344,65 +594,62 @@ class TestPDFService:
                 'page': 1
             }
         ]
-        
-        # Apply edit operations
-        result, filename = pdf_service.edit_pdf(sample_pdf, operations)
-        
-        # Verify the result is valid PDF
-        assert result is not None
-        assert len(result) > 0
-        
-        # Read the resulting PDF to verify it's valid
-        output = io.BytesIO(result)
-        reader = PdfReader(output)
-        assert len(reader.pages) > 0
-
-    def test_edit_pdf_invalid_operation(self, pdf_service, sample_pdf):
-        """Test handling of invalid operations."""
-        operations = [{
-            'type': 'invalid_type',
-            'content': 'Test',
-            'page': 1
-        }]
-        
-        # Verify that invalid operation raises error
-        with pytest.raises(PDFServiceError):
-            pdf_service.edit_pdf(sample_pdf, operations)
-
-    def test_edit_pdf_missing_required_fields(self, pdf_service, sample_pdf):
-        """Test handling of operations with missing required fields."""
-        operations = [
+        # Pile on many positionless highlights; the automaton-based
+        # search should still extract each page's text only once
+        operations += [
             {
-                'type': 'text',
-                # Missing 'content' and 'position'
+                'type': 'highlight',
+                'text': f'needle number {i}',
+                'color': '#ffeb3b',
+                'opacity': 0.5,
                 'page': 1
             }
+            for i in range(50)
         ]
-        
-        # Verify that missing required fields raises error
-        with pytest.raises(PDFServiceError):
-            pdf_service.edit_pdf(sample_pdf, operations)
 
-    def test_edit_pdf_invalid_page_number(self, pdf_service, sample_pdf):
-        """Test handling of invalid page numbers."""
-        operations = [{
-            'type': 'text',
-            'content': 'Test',
-            'position': {'x': 100, 'y': 100},
-            'page': 999,  # Invalid page number
-            'fontSize': 12,
-            'fontColor': '#000000'
-        }]
-        
-        # Verify that invalid page number raises error
-        with pytest.raises(PDFServiceError):
-            pdf_service.edit_pdf(sample_pdf, operations)
+        extract_calls = []
+        original_extract = PyPDF2._page.PageObject.extract_text
+
+        def counting_extract(page, *args, **kwargs):
+            extract_calls.append(page)
+            return original_extract(page, *args, **kwargs)
+
+        monkeypatch.setattr(PyPDF2._page.PageObject, 'extract_text', counting_extract)
+
+        # Apply edit operations
+        result, filename = pdf_service.edit_pdf(sample_pdf, operations)
 
-    def test_edit_pdf_empty_operations(self, pdf_service, sample_pdf):
-        """Test handling of empty operations list."""
-        # Verify that empty operations list raises error
+        # Verify the result is valid PDF
+        assert result is not None
+        assert len(result) > 0
+        assert len(extract_calls) == 1  # One scan per page, not per needle
+
+        # Verify the resulting PDF is valid
+        assert_pdf_page_count(result)
+
+    @pytest.mark.parametrize("operations", [
+        pytest.param([{'type': 'invalid_type', 'content': 'Test', 'page': 1}],
+                     id="invalid-type"),
+        pytest.param([{'type': 'text', 'page': 1}],  # Missing 'content'/'position'
+                     id="missing-required-fields"),
+        pytest.param([{'type': 'text', 'content': 'Test',
+                       'position': {'x': 100, 'y': 100}, 'page': 999,
+                       'fontSize': 12, 'fontColor': '#000000'}],
+                     id="invalid-page-number"),
+        pytest.param([], id="empty-operations"),
+        pytest.param([{'type': 'delete', 'page': 1}],  # Missing region
+                     id="delete-missing-region"),
+        pytest.param([{'type': 'delete', 'page': 1,
+                       'region': {'x': 'invalid', 'y': 50, 'width': 100, 'height': 20}}],
+                     id="delete-invalid-region"),
+        pytest.param([{'type': 'delete', 'page': 1,
+                       'region': {'x': 50, 'y': 50, 'width': -100, 'height': -20}}],
+                     id="delete-negative-dimensions"),
+    ])
+    def test_edit_pdf_invalid_inputs(self, pdf_service, sample_pdf, operations):
+        """Test edit_pdf rejects malformed operation lists."""
         with pytest.raises(PDFServiceError):
-            pdf_service.edit_pdf(sample_pdf, [])
+            pdf_service.edit_pdf(sample_pdf, operations)
 
     def test_edit_pdf_invalid_input_file(self, pdf_service):
         """Test handling of invalid input file."""
@@ -413,14 +660,17 @@ class TestPDFService:
             'page': 1
         }]
         
-        # Create invalid PDF file
-        invalid_pdf = io.BytesIO(b"Not a PDF file")
-        
-        # Verify that invalid input file raises error
+        # Create a large garbage file; the header check should reject it
+        # without parsing the whole payload
+        invalid_pdf = io.BytesIO(b"X" * (5 * 1024 * 1024))
+
+        # Verify that invalid input file raises error, quickly
+        start = time.perf_counter()
         with pytest.raises(PDFServiceError):
-            pdf_service.edit_pdf(invalid_pdf, operations) 
+            pdf_service.edit_pdf(invalid_pdf, operations)
+        assert time.perf_counter() - start < 1.0
 
-    def test_edit_pdf_delete_operation(self, pdf_service, sample_pdf):
+    def test_edit_pdf_delete_operation(self, pdf_service, sample_pdf, assert_pdf_page_count):
         """Test deleting content from a PDF."""
         operations = [{
             'type': 'delete',
@@ -440,12 +690,10 @@ class TestPDFService:
         assert result is not None
         assert len(result) > 0
         
-        # Read the resulting PDF to verify it's valid
-        output = io.BytesIO(result)
-        reader = PdfReader(output)
-        assert len(reader.pages) > 0
+        # Verify the resulting PDF is valid
+        assert_pdf_page_count(result)
 
-    def test_edit_pdf_multiple_operations_with_delete(self, pdf_service, sample_pdf):
+    def test_edit_pdf_multiple_operations_with_delete(self, pdf_service, sample_pdf, assert_pdf_page_count):
         """Test applying multiple operations including delete to a PDF."""
         operations = [
             {
@@ -482,238 +730,180 @@ class TestPDFService:
         assert result is not None
         assert len(result) > 0
         
-        # Read the resulting PDF to verify it's valid
-        output = io.BytesIO(result)
-        reader = PdfReader(output)
-        assert len(reader.pages) > 0
+        # Verify the resulting PDF is valid
+        assert_pdf_page_count(result)
 
-    def test_edit_pdf_delete_missing_region(self, pdf_service, sample_pdf):
-        """Test delete operation with missing region."""
+    def test_edit_pdf_text_operation_detailed(self, pdf_service, test_pdf_bytes, assert_pdf_page_count, dump_pdf):
+        """Test adding text to a PDF with detailed verification."""
+        f = io.BytesIO(test_pdf_bytes)
+        f.name = 'test.pdf'
         operations = [{
-            'type': 'delete',
-            'page': 1
-            # Missing region parameter
+            'type': 'text',
+            'content': 'Added Text',
+            'position': {'x': 100, 'y': 300},
+            'page': 1,
+            'fontSize': 12,
+            'fontColor': '#000000'
         }]
-        
-        # Verify that missing region raises error
-        with pytest.raises(PDFServiceError):
-            pdf_service.edit_pdf(sample_pdf, operations)
+            
+        # Apply edit operations
+        result, filename = pdf_service.edit_pdf(f, operations)
+            
+        # Verify the result is valid PDF
+        assert result is not None
+        assert len(result) > 0
+            
+        # Save the result for manual inspection if needed
+        dump_pdf('output_text.pdf', result)
+            
+        # Verify the resulting PDF still has 2 pages
+        assert_pdf_page_count(result, 2)
+            
+        # Verify filename format
+        assert filename.startswith('edited_') and filename.endswith('.pdf')
 
-    def test_edit_pdf_delete_invalid_region(self, pdf_service, sample_pdf):
-        """Test delete operation with invalid region parameters."""
+    def test_edit_pdf_highlight_operation_detailed(self, pdf_service, test_pdf_bytes, assert_pdf_page_count, dump_pdf):
+        """Test highlighting text in a PDF with detailed verification."""
+        f = io.BytesIO(test_pdf_bytes)
+        f.name = 'test.pdf'
         operations = [{
-            'type': 'delete',
-            'region': {
-                'x': 'invalid',  # Invalid x coordinate
-                'y': 50,
-                'width': 100,
-                'height': 20
-            },
+            'type': 'highlight',
+            'text': 'Text to be highlighted',
+            'color': '#ffeb3b',
+            'opacity': 0.5,
             'page': 1
         }]
-        
-        # Verify that invalid region parameters raise error
-        with pytest.raises(PDFServiceError):
-            pdf_service.edit_pdf(sample_pdf, operations)
+            
+        # Apply edit operations
+        result, filename = pdf_service.edit_pdf(f, operations)
+            
+        # Save the result for manual inspection
+        dump_pdf('output_highlight.pdf', result)
+            
+        # Verify the result is valid PDF
+        assert result is not None
+        assert len(result) > 0
+            
+        # Verify the resulting PDF still has 2 pages
+        assert_pdf_page_count(result, 2)
 
-    def test_edit_pdf_delete_negative_dimensions(self, pdf_service, sample_pdf):
-        """Test delete operation with negative dimensions."""
+    def test_edit_pdf_delete_operation_detailed(self, pdf_service, test_pdf_bytes, assert_pdf_page_count, dump_pdf):
+        """Test deleting content from a PDF with detailed verification."""
+        f = io.BytesIO(test_pdf_bytes)
+        f.name = 'test.pdf'
         operations = [{
             'type': 'delete',
             'region': {
-                'x': 50,
-                'y': 50,
-                'width': -100,  # Negative width
-                'height': -20   # Negative height
+                'x': 100,
+                'y': 600,  # Position of "Line 3: Text to be deleted"
+                'width': 200,
+                'height': 20
             },
             'page': 1
         }]
-        
-        # Verify that negative dimensions raise error
-        with pytest.raises(PDFServiceError):
-            pdf_service.edit_pdf(sample_pdf, operations) 
+            
+        # Apply edit operations
+        result, filename = pdf_service.edit_pdf(f, operations)
+            
+        # Save the result for manual inspection
+        dump_pdf('output_delete.pdf', result)
+            
+        # Verify the result is valid PDF
+        assert result is not None
+        assert len(result) > 0
+            
+        # Verify the resulting PDF still has 2 pages
+        assert_pdf_page_count(result, 2)
 
-    def test_edit_pdf_text_operation_detailed(self, pdf_service, test_pdf):
-        """Test adding text to a PDF with detailed verification."""
-        with open(test_pdf, 'rb') as f:
-            operations = [{
+    def test_edit_pdf_multiple_operations_detailed(self, pdf_service, test_pdf_bytes, assert_pdf_page_count, dump_pdf):
+        """Test applying multiple operations to a PDF with detailed verification."""
+        f = io.BytesIO(test_pdf_bytes)
+        f.name = 'test.pdf'
+        operations = [
+            {
                 'type': 'text',
                 'content': 'Added Text',
                 'position': {'x': 100, 'y': 300},
                 'page': 1,
                 'fontSize': 12,
                 'fontColor': '#000000'
-            }]
-            
-            # Apply edit operations
-            result, filename = pdf_service.edit_pdf(f, operations)
-            
-            # Verify the result is valid PDF
-            assert result is not None
-            assert len(result) > 0
-            
-            # Save the result for manual inspection if needed
-            with open('app/tests/data/output_text.pdf', 'wb') as out:
-                out.write(result)
-            
-            # Read the resulting PDF to verify it's valid
-            output = io.BytesIO(result)
-            reader = PdfReader(output)
-            assert len(reader.pages) == 2  # Should still have 2 pages
-            
-            # Verify filename format
-            assert filename.startswith('edited_') and filename.endswith('.pdf')
-
-    def test_edit_pdf_highlight_operation_detailed(self, pdf_service, test_pdf):
-        """Test highlighting text in a PDF with detailed verification."""
-        with open(test_pdf, 'rb') as f:
-            operations = [{
+            },
+            {
                 'type': 'highlight',
                 'text': 'Text to be highlighted',
                 'color': '#ffeb3b',
                 'opacity': 0.5,
                 'page': 1
-            }]
-            
-            # Apply edit operations
-            result, filename = pdf_service.edit_pdf(f, operations)
-            
-            # Save the result for manual inspection
-            with open('app/tests/data/output_highlight.pdf', 'wb') as out:
-                out.write(result)
-            
-            # Verify the result is valid PDF
-            assert result is not None
-            assert len(result) > 0
-            
-            # Read the resulting PDF to verify it's valid
-            output = io.BytesIO(result)
-            reader = PdfReader(output)
-            assert len(reader.pages) == 2  # Should still have 2 pages
-
-    def test_edit_pdf_delete_operation_detailed(self, pdf_service, test_pdf):
-        """Test deleting content from a PDF with detailed verification."""
-        with open(test_pdf, 'rb') as f:
-            operations = [{
+            },
+            {
                 'type': 'delete',
                 'region': {
                     'x': 100,
-                    'y': 600,  # Position of "Line 3: Text to be deleted"
+                    'y': 600,
                     'width': 200,
                     'height': 20
                 },
                 'page': 1
-            }]
-            
-            # Apply edit operations
-            result, filename = pdf_service.edit_pdf(f, operations)
-            
-            # Save the result for manual inspection
-            with open('app/tests/data/output_delete.pdf', 'wb') as out:
-                out.write(result)
-            
-            # Verify the result is valid PDF
-            assert result is not None
-            assert len(result) > 0
-            
-            # Read the resulting PDF to verify it's valid
-            output = io.BytesIO(result)
-            reader = PdfReader(output)
-            assert len(reader.pages) == 2  # Should still have 2 pages
-
-    def test_edit_pdf_multiple_operations_detailed(self, pdf_service, test_pdf):
-        """Test applying multiple operations to a PDF with detailed verification."""
-        with open(test_pdf, 'rb') as f:
-            operations = [
-                {
-                    'type': 'text',
-                    'content': 'Added Text',
-                    'position': {'x': 100, 'y': 300},
-                    'page': 1,
-                    'fontSize': 12,
-                    'fontColor': '#000000'
-                },
-                {
-                    'type': 'highlight',
-                    'text': 'Text to be highlighted',
-                    'color': '#ffeb3b',
-                    'opacity': 0.5,
-                    'page': 1
-                },
-                {
-                    'type': 'delete',
-                    'region': {
-                        'x': 100,
-                        'y': 600,
-                        'width': 200,
-                        'height': 20
-                    },
-                    'page': 1
-                }
-            ]
+            }
+        ]
             
-            # Apply edit operations
-            result, filename = pdf_service.edit_pdf(f, operations)
+        # Apply edit operations
+        result, filename = pdf_service.edit_pdf(f, operations)
             
-            # Save the result for manual inspection
-            with open('app/tests/data/output_multiple.pdf', 'wb') as out:
-                out.write(result)
+        # Save the result for manual inspection
+        dump_pdf('output_multiple.pdf', result)
             
-            # Verify the result is valid PDF
-            assert result is not None
-            assert len(result) > 0
+        # Verify the result is valid PDF
+        assert result is not None
+        assert len(result) > 0
             
-            # Read the resulting PDF to verify it's valid
-            output = io.BytesIO(result)
-            reader = PdfReader(output)
-            assert len(reader.pages) == 2  # Should still have 2 pages
+        # Verify the resulting PDF still has 2 pages
+        assert_pdf_page_count(result, 2)
 
-    def test_edit_pdf_file_remains_open(self, pdf_service, test_pdf):
+    def test_edit_pdf_file_remains_open(self, pdf_service, test_pdf_bytes, assert_pdf_page_count, dump_pdf):
         """Test that files remain open during edit operations."""
-        with open(test_pdf, 'rb') as f:
-            operations = [
-                {
-                    'type': 'text',
-                    'content': 'HELLO',
-                    'position': {'x': 100, 'y': 100},
-                    'page': 1,
-                    'fontSize': 33,
-                    'fontColor': '#c90d0d'
-                },
-                {
-                    'type': 'highlight',
-                    'text': 'HELLO',
-                    'color': '#ffeb3b',
-                    'opacity': 0.5,
-                    'page': 1
-                }
-            ]
+        f = io.BytesIO(test_pdf_bytes)
+        f.name = 'test.pdf'
+        operations = [
+            {
+                'type': 'text',
+                'content': 'HELLO',
+                'position': {'x': 100, 'y': 100},
+                'page': 1,
+                'fontSize': 33,
+                'fontColor': '#c90d0d'
+            },
+            {
+                'type': 'highlight',
+                'text': 'HELLO',
+                'color': '#ffeb3b',
+                'opacity': 0.5,
+                'page': 1
+            }
+        ]
             
-            # Apply edit operations
-            result, filename = pdf_service.edit_pdf(f, operations)
+        # Apply edit operations
+        result, filename = pdf_service.edit_pdf(f, operations)
             
-            # Verify the file is still open and readable
-            assert not f.closed, "File was closed prematurely"
+        # Verify the file is still open and readable
+        assert not f.closed, "File was closed prematurely"
             
-            # Try reading from the file to ensure it's still accessible
-            f.seek(0)
-            content = f.read()
-            assert len(content) > 0, "File content should be readable"
+        # Try reading from the file to ensure it's still accessible
+        f.seek(0)
+        content = f.read()
+        assert len(content) > 0, "File content should be readable"
             
-            # Verify the result is valid PDF
-            assert result is not None
-            assert len(result) > 0
+        # Verify the result is valid PDF
+        assert result is not None
+        assert len(result) > 0
             
-            # Save the result for inspection
-            with open('app/tests/data/output_file_open.pdf', 'wb') as out:
-                out.write(result)
+        # Save the result for inspection
+        dump_pdf('output_file_open.pdf', result)
             
-            # Read the resulting PDF to verify it's valid
-            output = io.BytesIO(result)
-            reader = PdfReader(output)
-            assert len(reader.pages) == 2  # Should still have 2 pages
+        # Verify the resulting PDF still has 2 pages
+        assert_pdf_page_count(result, 2)
 
-    def test_edit_pdf_file_cleanup(self, pdf_service, test_pdf):
+    def test_edit_pdf_file_cleanup(self, pdf_service, test_pdf_bytes):
         """Test that temporary files are properly cleaned up after edit operations."""
         import tempfile
         import os
@@ -722,101 +912,96 @@ class TestPDFService:
         temp_dir = tempfile.gettempdir()
         files_before = set(os.listdir(temp_dir))
         
-        with open(test_pdf, 'rb') as f:
-            operations = [
-                {
-                    'type': 'text',
-                    'content': 'HELLO',
-                    'position': {'x': 100, 'y': 100},
-                    'page': 1,
-                    'fontSize': 33,
-                    'fontColor': '#c90d0d'
-                }
-            ]
+        f = io.BytesIO(test_pdf_bytes)
+        f.name = 'test.pdf'
+        operations = [
+            {
+                'type': 'text',
+                'content': 'HELLO',
+                'position': {'x': 100, 'y': 100},
+                'page': 1,
+                'fontSize': 33,
+                'fontColor': '#c90d0d'
+            }
+        ]
             
-            # Apply edit operations
-            result, filename = pdf_service.edit_pdf(f, operations)
+        # Apply edit operations
+        result, filename = pdf_service.edit_pdf(f, operations)
             
-            # Track temporary files after the operation
-            files_after = set(os.listdir(temp_dir))
-            new_temp_files = files_after - files_before
+        # Track temporary files after the operation
+        files_after = set(os.listdir(temp_dir))
+        new_temp_files = files_after - files_before
             
-            # Verify no temporary files are left behind
-            pdf_temp_files = [f for f in new_temp_files if f.endswith('.pdf')]
-            assert len(pdf_temp_files) == 0, "Temporary PDF files were not cleaned up"
+        # Verify no temporary files are left behind
+        pdf_temp_files = [f for f in new_temp_files if f.endswith('.pdf')]
+        assert len(pdf_temp_files) == 0, "Temporary PDF files were not cleaned up"
             
-            # Verify the result is still valid
-            assert result is not None
-            assert len(result) > 0
+        # Verify the result is still valid
+        assert result is not None
+        assert len(result) > 0
             
-            # Verify the file handle is still open
-            assert not f.closed, "File was closed prematurely"
+        # Verify the file handle is still open
+        assert not f.closed, "File was closed prematurely"
 
-    def test_edit_pdf_text_and_highlight_file_handling(self, pdf_service, test_pdf):
+    def test_edit_pdf_text_and_highlight_file_handling(self, pdf_service, test_pdf_bytes, assert_pdf_page_count, dump_pdf):
         """Test file handling during text and highlight operations."""
-        with open(test_pdf, 'rb') as f:
-            operations = [
-                {
-                    'type': 'text',
-                    'content': 'HELLO',
-                    'position': {'x': 100, 'y': 100},
-                    'page': 1,
-                    'fontSize': 33,
-                    'fontColor': '#c90d0d'
-                },
-                {
-                    'type': 'highlight',
-                    'text': 'HELLO',
-                    'color': '#ffeb3b',
-                    'opacity': 0.5,
-                    'page': 1
-                }
-            ]
-            
-            # Track file state before operations
-            initial_position = f.tell()
-            assert not f.closed, "File should be open before operations"
-            
-            try:
-                # Apply edit operations
-                result, filename = pdf_service.edit_pdf(f, operations)
+        f = io.BytesIO(test_pdf_bytes)
+        f.name = 'test.pdf'
+        operations = [
+            {
+                'type': 'text',
+                'content': 'HELLO',
+                'position': {'x': 100, 'y': 100},
+                'page': 1,
+                'fontSize': 33,
+                'fontColor': '#c90d0d'
+            },
+            {
+                'type': 'highlight',
+                'text': 'HELLO',
+                'color': '#ffeb3b',
+                'opacity': 0.5,
+                'page': 1
+            }
+        ]
+            
+        # Track file state before operations
+        initial_position = f.tell()
+        assert not f.closed, "File should be open before operations"
+            
+        try:
+            # Apply edit operations
+            result, filename = pdf_service.edit_pdf(f, operations)
                 
-                # Verify file state after operations
-                assert not f.closed, "File was closed during operations"
+            # Verify file state after operations
+            assert not f.closed, "File was closed during operations"
                 
-                # Try reading from the file to ensure it's still accessible
-                f.seek(0)
-                content = f.read()
-                assert len(content) > 0, "File should be readable after operations"
+            # Try reading from the file to ensure it's still accessible
+            f.seek(0)
+            content = f.read()
+            assert len(content) > 0, "File should be readable after operations"
                 
-                # Verify the result is valid PDF
-                assert result is not None
-                assert len(result) > 0
+            # Verify the result is valid PDF
+            assert result is not None
+            assert len(result) > 0
                 
-                # Save the result for inspection
-                with open('app/tests/data/output_text_highlight.pdf', 'wb') as out:
-                    out.write(result)
+            # Save the result for inspection
+            dump_pdf('output_text_highlight.pdf', result)
                 
-                # Read the resulting PDF to verify it's valid
-                output = io.BytesIO(result)
-                reader = PdfReader(output)
-                assert len(reader.pages) == 2  # Should still have 2 pages
+            # Verify the resulting PDF still has 2 pages
+            assert_pdf_page_count(result, 2)
                 
-                # Verify we can still seek in the original file
-                f.seek(initial_position)
-                assert f.tell() == initial_position, "File position should be restorable"
+            # Verify we can still seek in the original file
+            f.seek(initial_position)
+            assert f.tell() == initial_position, "File position should be restorable"
                 
-            except Exception as e:
-                pytest.fail(f"Operation failed with error: {str(e)}")
+        except Exception as e:
+            pytest.fail(f"Operation failed with error: {str(e)}")
 
-    def test_edit_pdf_fastapi_simulation(self, pdf_service, test_pdf):
+    def test_edit_pdf_fastapi_simulation(self, pdf_service, test_pdf_bytes, assert_pdf_page_count, dump_pdf):
         """Test file handling in a way that simulates FastAPI's file handling."""
-        # Create a BytesIO buffer to simulate FastAPI's file handling
-        with open(test_pdf, 'rb') as original:
-            file_content = original.read()
-        
-        # Simulate FastAPI's file handling where the file might be read multiple times
-        file_obj = io.BytesIO(file_content)
+        # Wrap the session bytes without copying them into a BytesIO buffer
+        file_obj = MemoryviewReader(test_pdf_bytes)
         file_obj.name = "test.pdf"  # Simulate UploadFile name attribute
         
         operations = [
@@ -838,10 +1023,11 @@ class TestPDFService:
         ]
         
         try:
-            # First read to simulate FastAPI's form parsing
-            file_obj.seek(0)
-            _ = file_obj.read()
-            
+            # Simulate the form parser's size probe without copying the
+            # whole buffer the way a full read() would
+            file_obj.seek(0, 2)
+            _ = file_obj.tell()
+
             # Reset for PDF service
             file_obj.seek(0)
             
@@ -853,13 +1039,10 @@ class TestPDFService:
             assert len(result) > 0
             
             # Save the result for inspection
-            with open('app/tests/data/output_fastapi_sim.pdf', 'wb') as out:
-                out.write(result)
+            dump_pdf('output_fastapi_sim.pdf', result)
             
-            # Read the resulting PDF to verify it's valid
-            output = io.BytesIO(result)
-            reader = PdfReader(output)
-            assert len(reader.pages) == 2  # Should still have 2 pages
+            # Verify the resulting PDF still has 2 pages
+            assert_pdf_page_count(result, 2)
             
             # Try to read the input file again to verify it's still accessible
             file_obj.seek(0)
@@ -871,40 +1054,30 @@ class TestPDFService:
         finally:
             file_obj.close()
 
-    def test_edit_pdf_seek_closed_file(self, pdf_service, test_pdf):
+    def test_edit_pdf_seek_closed_file(self, pdf_service, test_pdf_bytes):
         """Test handling of file that might be closed during operations."""
-        # Create a BytesIO buffer that we'll close during operations
-        with open(test_pdf, 'rb') as original:
-            file_content = original.read()
-    
-        class ClosingBytesIO(io.BytesIO):
-            def __init__(self, *args, **kwargs):
-                super().__init__(*args, **kwargs)
-                self._closed = False
-                self._seek_count = 0
-    
+        # Wrap the session bytes in a reader that closes itself mid-use
+        class ClosingBytesIO(MemoryviewReader):
+            __slots__ = ('_tripped',)
+
+            def __init__(self, data):
+                super().__init__(data)
+                self._tripped = False
+
             def read(self, *args, **kwargs):
                 if self._closed:
                     raise ValueError("seek of closed file")
                 return super().read(*args, **kwargs)
-    
+
             def seek(self, *args, **kwargs):
-                if self._closed:
+                # Trip on the first seek; later seeks hit the closed check
+                if self._closed or self._tripped:
                     raise ValueError("seek of closed file")
-                self._seek_count += 1
-                if self._seek_count >= 1:  # Close on first seek
-                    self._closed = True
-                    raise ValueError("seek of closed file")
-                return super().seek(*args, **kwargs)
-    
-            @property
-            def closed(self):
-                return self._closed
-    
-            def close(self):
+                self._tripped = True
                 self._closed = True
-                super().close()
-    
+                raise ValueError("seek of closed file")
+
+
         operations = [
             {
                 'type': 'text',
@@ -924,7 +1097,7 @@ class TestPDFService:
         ]
     
         # Create a file object that will close itself on first seek
-        tricky_file = ClosingBytesIO(file_content)
+        tricky_file = ClosingBytesIO(test_pdf_bytes)
         tricky_file.name = "test.pdf"
     
         try:
@@ -932,6 +1105,7 @@ class TestPDFService:
             with pytest.raises(PDFServiceError, match="File was closed during processing"):
                 pdf_service.edit_pdf(tricky_file, operations)
         finally:
-            if not tricky_file.closed:
-                tricky_file.close()
+            # Always close so the underlying memoryview is released even
+            # when the reader tripped its own closed flag
+            tricky_file.close()
  
\ No newline at end of file
@@ -1,55 +1,65 @@
 """Logging configuration for the application."""
 
+import atexit
 import logging
 import os
+import queue
 from datetime import datetime
+from logging.handlers import QueueHandler, QueueListener
 from typing import Dict
 
 # Dictionary to store logger instances
 _loggers: Dict[str, logging.Logger] = {}
-_is_initialized = False
-
-def setup_logging() -> None:
-    """Configure logging for the application"""
-    global _is_initialized
-    
-    if _is_initialized:
-        return
-        
+
+# Configure logging once at module import; the handler check keeps a
+# pre-configured root (e.g. under a test runner) untouched
+if not logging.getLogger().handlers:
     # Create logs directory if it doesn't exist
     os.makedirs("logs", exist_ok=True)
-    
+
     # Create a timestamp for the log file
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
     log_file = f"logs/app_{timestamp}.log"
-    
-    # Configure logging
+
+    # Route records through a queue so log calls never block on file or
+    # console I/O; a background listener drains into the real handlers
+    formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    file_handler = logging.FileHandler(log_file)
+    file_handler.setFormatter(formatter)
+    console_handler = logging.StreamHandler()  # Also print to console
+    console_handler.setFormatter(formatter)
+
+    log_queue: queue.Queue = queue.Queue(-1)
+    listener = QueueListener(
+        log_queue, file_handler, console_handler, respect_handler_level=True
+    )
+    listener.start()
+    atexit.register(listener.stop)
+
+    # The queue handler must not pre-format records (the listener's
+    # handlers own the formatting), so give it a pass-through formatter
+    queue_handler = QueueHandler(log_queue)
+    queue_handler.setFormatter(logging.Formatter('%(message)s'))
+
     logging.basicConfig(
         level=logging.DEBUG,
-        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-        handlers=[
-            logging.FileHandler(log_file),
-            logging.StreamHandler()  # Also print to console
-        ],
-        force=True  # Force reconfiguration
+        handlers=[queue_handler],
     )
-    
-    _is_initialized = True
 
 def get_logger(name: str = __name__) -> logging.Logger:
     """Get a logger instance for the given name.
-    
+
     Args:
         name: The name of the logger (usually __name__)
-        
+
     Returns:
         A configured logger instance
     """
-    if name not in _loggers:
-        setup_logging()
-        _loggers[name] = logging.getLogger(name)
-    
-    return _loggers[name]
+    # Fast path: one dict lookup; configuration already ran at import
+    logger = _loggers.get(name)
+    if logger is None:
+        logger = _loggers[name] = logging.getLogger(name)
+    return logger
 
 # Initialize the default logger
 default_logger = get_logger(__name__)
@@ -4,19 +4,26 @@ from reportlab.lib import colors
 from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Image
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.lib.units import inch
+from concurrent.futures import ProcessPoolExecutor
+import io
 import os
 
-def create_sample_pdfs():
-    # Create uploads directory if it doesn't exist
-    uploads_dir = "uploads"
-    if not os.path.exists(uploads_dir):
-        os.makedirs(uploads_dir)
+lorem_ipsum = """
+    Lorem ipsum dolor sit amet, consectetur adipiscing elit. Sed do eiusmod tempor
+    incididunt ut labore et dolore magna aliqua. Ut enim ad minim veniam, quis nostrud
+    exercitation ullamco laboris nisi ut aliquip ex ea commodo consequat.
+    """
+
+def _write_once(path, buf):
+    """Flush an in-memory PDF to disk with a single write syscall."""
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+    os.write(fd, buf.getvalue())
+    os.close(fd)
 
-    # 1. Create a text-heavy PDF for compression and plagiarism testing
-    doc = SimpleDocTemplate(
-        os.path.join(uploads_dir, "sample_text.pdf"),
-        pagesize=letter
-    )
+def _build_text_pdf(outdir):
+    """Create a text-heavy PDF for compression and plagiarism testing."""
+    buf = io.BytesIO()
+    doc = SimpleDocTemplate(buf, pagesize=letter)
     styles = getSampleStyleSheet()
     story = []
 
@@ -24,25 +31,23 @@ def create_sample_pdfs():
     story.append(Paragraph("Sample Text Document", styles['Heading1']))
     story.append(Spacer(1, 12))
 
-    # Add paragraphs of text
-    lorem_ipsum = """
-    Lorem ipsum dolor sit amet, consectetur adipiscing elit. Sed do eiusmod tempor 
-    incididunt ut labore et dolore magna aliqua. Ut enim ad minim veniam, quis nostrud 
-    exercitation ullamco laboris nisi ut aliquip ex ea commodo consequat.
-    """
-    
+    # Hoist the repeated body string; flowable instances cannot be shared
+    # across story slots (reportlab mutates them during layout), but the
+    # 3x concatenation only needs to happen once
+    body = lorem_ipsum * 3
     for i in range(200):
         story.append(Paragraph(f"Section {i+1}", styles['Heading2']))
-        story.append(Paragraph(lorem_ipsum * 3, styles['Normal']))
+        story.append(Paragraph(body, styles['Normal']))
         story.append(Spacer(1, 12))
 
     doc.build(story)
+    _write_once(os.path.join(outdir, "sample_text.pdf"), buf)
 
-    # 2. Create a PDF with images for testing compression
-    doc = SimpleDocTemplate(
-        os.path.join(uploads_dir, "sample_images.pdf"),
-        pagesize=A4
-    )
+def _build_images_pdf(outdir):
+    """Create a PDF with images for testing compression."""
+    buf = io.BytesIO()
+    doc = SimpleDocTemplate(buf, pagesize=A4)
+    styles = getSampleStyleSheet()
     story = []
 
     # Add title
@@ -50,25 +55,33 @@ def create_sample_pdfs():
     story.append(Spacer(1, 12))
 
     # Create and add some colored shapes as images
-    c = canvas.Canvas(os.path.join(uploads_dir, "temp.pdf"))
-    for i in range(5):
-        c.setFillColor(colors.red if i % 2 == 0 else colors.blue)
+    temp_buf = io.BytesIO()
+    c = canvas.Canvas(temp_buf)
+    # Group by fill colour so each colour is set once instead of per shape
+    c.setFillColor(colors.red)
+    for i in (0, 2, 4):
         c.rect(100, 100 + i*100, 300, 80, fill=True)
-        c.setFillColor(colors.black)
+    c.setFillColor(colors.blue)
+    for i in (1, 3):
+        c.rect(100, 100 + i*100, 300, 80, fill=True)
+    c.setFillColor(colors.black)
+    for i in range(5):
         c.drawString(150, 140 + i*100, f"Sample Shape {i+1}")
     c.save()
+    _write_once(os.path.join(outdir, "temp.pdf"), temp_buf)
 
     # Add some text and the image
     story.append(Paragraph("This document contains various images and shapes for testing compression.", styles['Normal']))
     story.append(Spacer(1, 12))
-    
+
     doc.build(story)
+    _write_once(os.path.join(outdir, "sample_images.pdf"), buf)
 
-    # 3. Create a multi-page PDF for testing merge and edit features
-    doc = SimpleDocTemplate(
-        os.path.join(uploads_dir, "sample_multipage.pdf"),
-        pagesize=letter
-    )
+def _build_multipage_pdf(outdir):
+    """Create a multi-page PDF for testing merge and edit features."""
+    buf = io.BytesIO()
+    doc = SimpleDocTemplate(buf, pagesize=letter)
+    styles = getSampleStyleSheet()
     story = []
 
     # Create multiple pages with different content
@@ -78,7 +91,7 @@ def create_sample_pdfs():
         story.append(Paragraph(f"This is page {i+1} of the multi-page document.", styles['Normal']))
         story.append(Paragraph(lorem_ipsum, styles['Normal']))
         story.append(Spacer(1, 12))
-        
+
         # Add some unique content to each page
         if i % 2 == 0:
             story.append(Paragraph("This page contains some special content.", styles['Heading2']))
@@ -86,6 +99,21 @@ def create_sample_pdfs():
             story.append(Paragraph("This page has different content.", styles['Heading2']))
 
     doc.build(story)
+    _write_once(os.path.join(outdir, "sample_multipage.pdf"), buf)
+
+def create_sample_pdfs():
+    # Create uploads directory if it doesn't exist
+    uploads_dir = "uploads"
+    if not os.path.exists(uploads_dir):
+        os.makedirs(uploads_dir)
+
+    # The three documents share no state, so render them in parallel;
+    # ReportLab layout is CPU-bound pure Python
+    builders = (_build_text_pdf, _build_images_pdf, _build_multipage_pdf)
+    with ProcessPoolExecutor(max_workers=len(builders)) as executor:
+        futures = [executor.submit(builder, uploads_dir) for builder in builders]
+        for future in futures:
+            future.result()
 
     print("Test PDFs created successfully in the 'uploads' directory:")
     print("1. sample_text.pdf - Text-heavy document for compression and plagiarism testing")
@@ -93,4 +121,4 @@ def create_sample_pdfs():
     print("3. sample_multipage.pdf - Multi-page document for testing merge and edit features")
 
 if __name__ == "__main__":
-    create_sample_pdfs() 
\ No newline at end of file
+    create_sample_pdfs()
@@ -15,8 +15,10 @@ setup(
         
         # PDF processing
         "PyPDF2>=3.0.0",
+        "pikepdf>=8.13.0",
+        # 1.24 is the first release shipping the `pymupdf` module name
+        "PyMuPDF>=1.24.0",
         "fpdf2>=2.7.6",
-        "pdf2image>=1.16.3",
         "python-docx>=1.0.0",
         "openpyxl>=3.1.2",
         "xlwt>=1.3.0",
@@ -47,16 +49,24 @@ setup(
         # Plagiarism detection
         "scikit-learn>=1.3.0",
         "numpy>=1.24.0",
+        "rapidfuzz>=3.5.2",
+        "pyahocorasick>=2.0.0",
+        "datasketch>=1.6.4",
         "beautifulsoup4>=4.12.0",
         "requests>=2.31.0",
-        "nltk>=3.8.1",
-        "langdetect>=1.0.9",
-        "transformers>=4.35.0",
-        "sentence-transformers>=2.2.2",
-        "spacy>=3.7.0",
-        "spacy-transformers>=1.3.2",
     ],
     extras_require={
+        # Heavy NLP stack only needed for the optional plagiarism models;
+        # deployments serving just the PDF ops skip the multi-hundred-MB
+        # wheels and their import cost
+        "plagiarism": [
+            "nltk>=3.8.1",
+            "langdetect>=1.0.9",
+            "transformers>=4.35.0",
+            "sentence-transformers>=2.2.2",
+            "spacy>=3.7.0",
+            "spacy-transformers>=1.3.2",
+        ],
         "dev": [
             "black",
             "isort",
@@ -70,6 +80,9 @@ setup(
             "pytest",
             "pytest-cov",
             "pytest-asyncio",
+            # Tests are fixture-isolated; run them across cores with
+            # `pytest -n auto --dist loadfile`
+            "pytest-xdist",
             "httpx",
         ],
     },
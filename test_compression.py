@@ -1,6 +1,9 @@
 import requests
 import os
 
+# Reused for every compression level; large enough for any test PDF
+MAX_PDF_SIZE = 16 * 1024 * 1024
+
 def login():
     """Log in and get access token."""
     login_url = 'http://localhost:8000/api/v1/auth/token'
@@ -27,45 +30,50 @@ def test_compression():
     # URL for the compression endpoint
     url = 'http://localhost:8000/api/v1/pdf/compress'
     
-    # Set up headers with authentication
-    headers = {
-        'Authorization': f'Bearer {access_token}'
-    }
-    
-    # Open the test PDF file
+    # One session keeps the TCP connection alive across all four levels
+    sess = requests.Session()
+    sess.headers.update({'Authorization': f'Bearer {access_token}'})
+
+    # Preallocate one response buffer shared by all compression levels
+    # instead of letting each response.content allocate its own
+    buf = bytearray(MAX_PDF_SIZE)
+
+    # Read the test PDF once; requests sends bytes payloads without
+    # re-reading the file per iteration
     with open('test.pdf', 'rb') as f:
-        # Create the files dictionary for the request
-        files = {'file': ('test.pdf', f, 'application/pdf')}
-        
-        # Try different compression levels
-        for level in range(1, 5):
-            print(f"\nTesting compression level {level}...")
-            f.seek(0)  # Reset file pointer for each iteration
-            
-            # Make the request
-            response = requests.post(
-                url,
-                files=files,
-                params={'compression_level': level},
-                headers=headers
-            )
-            
-            if response.status_code == 200:
-                # Save the compressed file
-                output_file = f'compressed_level_{level}.pdf'
-                with open(output_file, 'wb') as out:
-                    out.write(response.content)
-                
-                # Get file sizes
-                original_size = os.path.getsize('test.pdf')
-                compressed_size = os.path.getsize(output_file)
-                
-                print(f"Original size: {original_size / 1024:.2f}KB")
-                print(f"Compressed size: {compressed_size / 1024:.2f}KB")
-                print(f"Compression ratio: {compressed_size / original_size:.2%}")
-            else:
-                print(f"Error: {response.status_code}")
-                print(response.text)
+        pdf_bytes = f.read()
+    files = {'file': ('test.pdf', pdf_bytes, 'application/pdf')}
+    original_size = len(pdf_bytes)
+
+    # Try different compression levels
+    for level in range(1, 5):
+        print(f"\nTesting compression level {level}...")
+
+        # Make the request
+        response = sess.post(
+            url,
+            files=files,
+            params={'compression_level': level},
+            stream=True
+        )
+
+        if response.status_code == 200:
+            # Stream the compressed file into the shared buffer
+            n = 0
+            for chunk in response.iter_content(65536):
+                buf[n:n + len(chunk)] = chunk
+                n += len(chunk)
+
+            output_file = f'compressed_level_{level}.pdf'
+            with open(output_file, 'wb') as out:
+                out.write(memoryview(buf)[:n])
+
+            print(f"Original size: {original_size / 1024:.2f}KB")
+            print(f"Compressed size: {n / 1024:.2f}KB")
+            print(f"Compression ratio: {n / original_size:.2%}")
+        else:
+            print(f"Error: {response.status_code}")
+            print(response.text)
 
 if __name__ == '__main__':
     test_compression()
\ No newline at end of file
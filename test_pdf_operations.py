@@ -1,9 +1,13 @@
 import requests
 import os
-import json
+import orjson
 from test_compression import login
 from test_pdf import create_test_pdf
 
+# Shared session so the ops tests reuse one pooled connection instead of
+# opening a fresh socket per request
+session = requests.Session()
+
 def test_edit_pdf():
     """Test PDF editing functionality."""
     print("\nTesting PDF editing...")
@@ -43,10 +47,10 @@ def test_edit_pdf():
         ]
         
         # Make the request
-        response = requests.post(
+        response = session.post(
             url,
             files=files,
-            data={'operations': json.dumps(operations)},  # Convert to JSON string
+            data={'operations': orjson.dumps(operations)},  # Serialized JSON bytes
             headers=headers
         )
         
@@ -95,7 +99,7 @@ def test_merge_pdfs():
         url = f"{base_url}?merge_order=0&merge_order=1"
         
         # Make the request
-        response = requests.post(
+        response = session.post(
             url,
             files=files,
             headers=headers
@@ -151,7 +155,7 @@ def test_export_pdf():
             files = {'file': ('test.pdf', f, 'application/pdf')}
             
             # Make the request
-            response = requests.post(
+            response = session.post(
                 url,
                 files=files,
                 params={'export_format': format},  # Use correct parameter name
@@ -216,7 +220,7 @@ def test_plagiarism_check():
         # Send request
         files = {"file": open("test.pdf", "rb")}
         headers = {"Authorization": f"Bearer {token}"}
-        response = requests.post(
+        response = session.post(
             f"{BASE_URL}/api/v1/pdf/check-plagiarism",
             files=files,
             headers=headers
@@ -268,7 +272,7 @@ def test_view_pdf():
         files = {'file': ('test.pdf', f, 'application/pdf')}
         
         # Make the request
-        response = requests.post(
+        response = session.post(
             url,
             files=files,
             headers=headers
@@ -1,13 +1,15 @@
 import pytest
 import io
-import os
 import logging
-from unittest.mock import Mock, AsyncMock
-from fastapi import UploadFile
 from app.services.pdf_service import PDFService
 
 logger = logging.getLogger(__name__)
 
+# Silence transitive library chatter at import; record construction is
+# wasted work for output no test asserts on
+logging.getLogger("pdfminer").setLevel(logging.WARNING)
+logging.getLogger("reportlab").setLevel(logging.WARNING)
+
 # Valid minimal PDF content
 VALID_PDF_CONTENT = b"""%PDF-1.7
 1 0 obj<</Type/Catalog/Pages 2 0 R>>endobj
@@ -24,114 +26,55 @@ startxref
 178
 %%EOF"""
 
-def create_test_pdf(filename: str, text: str) -> str:
-    """Create a test PDF file with given text."""
-    # Save to temporary file
-    temp_path = os.path.join(os.path.dirname(__file__), filename)
-    with open(temp_path, 'wb') as f:
-        f.write(VALID_PDF_CONTENT)
-    return temp_path
-
 @pytest.fixture
 def pdf_service():
     return PDFService()
 
+class FastUploadFile:
+    """Duck-typed UploadFile that skips unittest.mock's call dispatcher."""
+
+    filename = "test.pdf"
+
+    async def read(self):
+        return VALID_PDF_CONTENT
+
+    async def seek(self, offset):
+        pass
+
 @pytest.fixture
 def mock_file():
-    file = Mock(spec=UploadFile)
-    file.filename = "test.pdf"
-    file.read = AsyncMock(return_value=VALID_PDF_CONTENT)
-    file.seek = AsyncMock()
-    return file
+    # The service consumes UploadFile.read(), so the bytes are served
+    # straight from memory — no disk roundtrip per test
+    return FastUploadFile()
 
 @pytest.mark.asyncio
 async def test_add_text_to_existing_page(pdf_service, mock_file):
     """Test adding text to an existing page"""
-    logger.info("Starting test: add text to existing page")
-
-    # Create test PDF
-    test_pdf = create_test_pdf("test_add_text.pdf", "Original text")
-
-    try:
-        with open(test_pdf, 'rb') as f:
-            content = f.read()
-            mock_file.read = AsyncMock(return_value=content)
-
-        # Test viewing the PDF
-        result = await pdf_service.view(mock_file)
-        assert isinstance(result, bytes)
-        assert len(result) > 0
-
-    finally:
-        # Cleanup
-        if os.path.exists(test_pdf):
-            os.remove(test_pdf)
+    # Test viewing the PDF
+    result = await pdf_service.view(mock_file)
+    assert isinstance(result, bytes)
+    assert len(result) > 0
 
 @pytest.mark.asyncio
 async def test_add_text_to_new_page(pdf_service, mock_file):
     """Test adding text to a new page"""
-    logger.info("Starting test: add text to new page")
-
-    # Create test PDF
-    test_pdf = create_test_pdf("test_new_page.pdf", "First page text")
-
-    try:
-        with open(test_pdf, 'rb') as f:
-            content = f.read()
-            mock_file.read = AsyncMock(return_value=content)
-
-        # Test viewing the PDF
-        result = await pdf_service.view(mock_file)
-        assert isinstance(result, bytes)
-        assert len(result) > 0
-
-    finally:
-        # Cleanup
-        if os.path.exists(test_pdf):
-            os.remove(test_pdf)
+    # Test viewing the PDF
+    result = await pdf_service.view(mock_file)
+    assert isinstance(result, bytes)
+    assert len(result) > 0
 
 @pytest.mark.asyncio
 async def test_multiple_operations(pdf_service, mock_file):
     """Test multiple text operations on different pages"""
-    logger.info("Starting test: multiple operations")
-
-    # Create test PDF
-    test_pdf = create_test_pdf("test_multiple.pdf", "Original text")
-
-    try:
-        with open(test_pdf, 'rb') as f:
-            content = f.read()
-            mock_file.read = AsyncMock(return_value=content)
-
-        # Test viewing the PDF
-        result = await pdf_service.view(mock_file)
-        assert isinstance(result, bytes)
-        assert len(result) > 0
-
-    finally:
-        # Cleanup
-        if os.path.exists(test_pdf):
-            os.remove(test_pdf)
+    # Test viewing the PDF
+    result = await pdf_service.view(mock_file)
+    assert isinstance(result, bytes)
+    assert len(result) > 0
 
 @pytest.mark.asyncio
 async def test_text_formatting(pdf_service, mock_file):
     """Test various text formatting options"""
-    logger.info("Starting test: text formatting")
-
-    # Create test PDF
-    test_pdf = create_test_pdf("test_formatting.pdf", "Text with formatting")
-
-    try:
-        with open(test_pdf, 'rb') as f:
-            content = f.read()
-            mock_file.read = AsyncMock(return_value=content)
-
-        # Test viewing the PDF
-        result = await pdf_service.view(mock_file)
-        assert isinstance(result, bytes)
-        assert len(result) > 0
-
-    finally:
-        # Cleanup
-        if os.path.exists(test_pdf):
-            os.remove(test_pdf) 
\ No newline at end of file
+    # Test viewing the PDF
+    result = await pdf_service.view(mock_file)
+    assert isinstance(result, bytes)
+    assert len(result) > 0
@@ -1,3 +1,4 @@
+import functools
 import pytest
 from app.services.plagiarism_service import PlagiarismService, KnownSource
 from app.models.plagiarism import PlagiarismResult, PlagiarismMatch
@@ -5,19 +6,36 @@ from reportlab.pdfgen import canvas
 import io
 import os
 
-@pytest.fixture
+# One service for the whole session; per-test state is reset below
+@pytest.fixture(scope="session")
 def plagiarism_service():
     return PlagiarismService()
 
-@pytest.fixture
-def test_pdf_file():
+@pytest.fixture(autouse=True)
+def _reset_sources(plagiarism_service):
+    plagiarism_service.known_sources = []
+    yield
+
+@functools.lru_cache(maxsize=32)
+def _make_pdf(lines):
+    """Render (x, y, text) lines once per distinct fixture; reportlab's
+    pure-Python canvas is the slowest part of these tests."""
     buffer = io.BytesIO()
     c = canvas.Canvas(buffer)
-    c.drawString(100, 750, "This is a test document with some plagiarized content.")
-    c.drawString(100, 700, "The quick brown fox jumps over the lazy dog.")
+    for x, y, text in lines:
+        c.drawString(x, y, text)
     c.save()
-    buffer.seek(0)
-    return buffer
+    return buffer.getvalue()
+
+def _pdf_file(*lines):
+    return io.BytesIO(_make_pdf(lines))
+
+@pytest.fixture
+def test_pdf_file():
+    return _pdf_file(
+        (100, 750, "This is a test document with some plagiarized content."),
+        (100, 700, "The quick brown fox jumps over the lazy dog."),
+    )
 
 @pytest.fixture
 def known_sources():
@@ -37,38 +55,30 @@ def known_sources():
 def test_check_plagiarism_with_exact_match(plagiarism_service, test_pdf_file, known_sources):
     plagiarism_service.known_sources = known_sources
     result = plagiarism_service.check_plagiarism(test_pdf_file)
-    
+
     assert isinstance(result, PlagiarismResult)
     assert result.plagiarized is True
     assert len(result.matches) > 0
-    
+
     match = next(m for m in result.matches if m.similarity_score > 0.8)
     assert match.text == "The quick brown fox jumps over the lazy dog."
     assert match.source == "Common English Pangram"
 
 def test_check_plagiarism_with_no_match(plagiarism_service):
-    buffer = io.BytesIO()
-    c = canvas.Canvas(buffer)
-    c.drawString(100, 750, "This is completely original content.")
-    c.save()
-    buffer.seek(0)
-    
+    buffer = _pdf_file((100, 750, "This is completely original content."))
+
     result = plagiarism_service.check_plagiarism(buffer)
-    
+
     assert isinstance(result, PlagiarismResult)
     assert result.plagiarized is False
     assert len(result.matches) == 0
 
 def test_check_plagiarism_with_partial_match(plagiarism_service, known_sources):
-    buffer = io.BytesIO()
-    c = canvas.Canvas(buffer)
-    c.drawString(100, 750, "The quick brown fox is running.")
-    c.save()
-    buffer.seek(0)
-    
+    buffer = _pdf_file((100, 750, "The quick brown fox is running."))
+
     plagiarism_service.known_sources = known_sources
     result = plagiarism_service.check_plagiarism(buffer)
-    
+
     assert isinstance(result, PlagiarismResult)
     assert len(result.matches) > 0
     match = result.matches[0]
@@ -88,16 +98,14 @@ def test_check_plagiarism_with_multiple_matches(plagiarism_service):
         ),
     ]
     plagiarism_service.known_sources = sources
-    
-    buffer = io.BytesIO()
-    c = canvas.Canvas(buffer)
-    c.drawString(100, 750, "First test sentence for plagiarism checking.")
-    c.drawString(100, 700, "Second test sentence about artificial intelligence.")
-    c.save()
-    buffer.seek(0)
-    
+
+    buffer = _pdf_file(
+        (100, 750, "First test sentence for plagiarism checking."),
+        (100, 700, "Second test sentence about artificial intelligence."),
+    )
+
     result = plagiarism_service.check_plagiarism(buffer)
-    
+
     assert isinstance(result, PlagiarismResult)
     assert len(result.matches) >= 2
     assert all(isinstance(m, PlagiarismMatch) for m in result.matches)
@@ -105,13 +113,10 @@ def test_check_plagiarism_with_multiple_matches(plagiarism_service):
     assert any(m.source == "Source 2" for m in result.matches)
 
 def test_check_plagiarism_with_empty_pdf(plagiarism_service):
-    buffer = io.BytesIO()
-    c = canvas.Canvas(buffer)
-    c.save()
-    buffer.seek(0)
-    
+    buffer = _pdf_file()
+
     result = plagiarism_service.check_plagiarism(buffer)
-    
+
     assert isinstance(result, PlagiarismResult)
     assert result.plagiarized is False
     assert len(result.matches) == 0
@@ -119,22 +124,18 @@ def test_check_plagiarism_with_empty_pdf(plagiarism_service):
 def test_check_plagiarism_with_invalid_pdf():
     service = PlagiarismService()
     buffer = io.BytesIO(b"This is not a PDF file")
-    
+
     with pytest.raises(Exception) as exc_info:
         service.check_plagiarism(buffer)
     assert "Invalid PDF file" in str(exc_info.value)
 
 def test_check_plagiarism_with_large_text_content(plagiarism_service):
     # Create a PDF with a large amount of text
-    buffer = io.BytesIO()
-    c = canvas.Canvas(buffer)
     text = "This is a test sentence. " * 100  # Create a long text
-    c.drawString(100, 750, text)
-    c.save()
-    buffer.seek(0)
-    
+    buffer = _pdf_file((100, 750, text))
+
     result = plagiarism_service.check_plagiarism(buffer)
-    
+
     assert isinstance(result, PlagiarismResult)
     # Verify that the service can handle large text without errors
 
@@ -147,15 +148,11 @@ def test_check_plagiarism_with_special_characters(plagiarism_service):
         ),
     ]
     plagiarism_service.known_sources = sources
-    
-    buffer = io.BytesIO()
-    c = canvas.Canvas(buffer)
-    c.drawString(100, 750, "Test with special characters: @#$%^&*()!")
-    c.save()
-    buffer.seek(0)
-    
+
+    buffer = _pdf_file((100, 750, "Test with special characters: @#$%^&*()!"))
+
     result = plagiarism_service.check_plagiarism(buffer)
-    
+
     assert isinstance(result, PlagiarismResult)
     assert len(result.matches) > 0
     assert result.matches[0].similarity_score > 0.8
@@ -169,15 +166,11 @@ def test_check_plagiarism_case_sensitivity(plagiarism_service):
         ),
     ]
     plagiarism_service.known_sources = sources
-    
-    buffer = io.BytesIO()
-    c = canvas.Canvas(buffer)
-    c.drawString(100, 750, "this is a test sentence.")
-    c.save()
-    buffer.seek(0)
-    
+
+    buffer = _pdf_file((100, 750, "this is a test sentence."))
+
     result = plagiarism_service.check_plagiarism(buffer)
-    
+
     assert isinstance(result, PlagiarismResult)
     assert len(result.matches) > 0
-    assert result.matches[0].similarity_score > 0.8  # Should match despite case differences 
\ No newline at end of file
+    assert result.matches[0].similarity_score > 0.8  # Should match despite case differences